@@ -0,0 +1,13 @@
+"""
+Shared pytest fixtures for the converter tests
+"""
+
+import pytest
+
+from figma_to_html import FigmaToHTMLConverter
+
+
+@pytest.fixture(scope="session")
+def converter():
+    """Converter instance shared by all tests, never touching the on-disk cache"""
+    return FigmaToHTMLConverter("test_api_key", use_cache=False)
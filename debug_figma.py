@@ -5,42 +5,62 @@ This will help identify why border radius isn't showing up
 """
 
 import os
+import re
 import sys
 import json
 from figma_to_html import FigmaToHTMLConverter
 
+# Deepest tree level printed; also how deep the file is fetched
+MAX_DEPTH = 3
+
+# Shared default for nodes without children, avoids a new list per leaf
+_EMPTY = ()
+
+# Property names that may describe corner rounding
+_RADIUS_RE = re.compile(r"radius|corner", re.IGNORECASE)
+
 def print_node_info(node, depth=0):
     """Print detailed node information"""
-    indent = "  " * depth
-    node_type = node.get("type", "UNKNOWN")
-    node_name = node.get("name", "Unnamed")
-    
-    print(f"{indent}📦 {node_type}: {node_name}")
-    
-    # Check for corner radius properties
-    radius_props = {}
-    for key in node.keys():
-        if "radius" in key.lower() or "corner" in key.lower():
-            radius_props[key] = node[key]
-    
-    if radius_props:
-        print(f"{indent}   🔵 Radius properties found:")
-        for key, value in radius_props.items():
-            print(f"{indent}      {key}: {value}")
-    
-    # Check for fills
-    if node.get("fills"):
-        print(f"{indent}   🎨 Has fills: {len(node['fills'])} fill(s)")
-    
-    # Check for strokes
-    if node.get("strokes"):
-        print(f"{indent}   ✏️  Has strokes: {len(node['strokes'])} stroke(s)")
-    
-    # Recurse into children
-    children = node.get("children", [])
-    if children and depth < 3:  # Limit depth to avoid too much output
-        for child in children[:10]:  # Limit to first 10 children
-            print_node_info(child, depth + 1)
+    # Buffer the whole report and write it once instead of a print per line
+    lines = []
+    collect_node_info(node, depth, lines)
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def collect_node_info(node, depth, lines):
+    """Append detailed node information lines to `lines`"""
+    stack = [(node, depth)]
+    while stack:
+        node, depth = stack.pop()
+        indent = "  " * depth
+        node_type = node.get("type", "UNKNOWN")
+        node_name = node.get("name", "Unnamed")
+        
+        lines.append(f"{indent}📦 {node_type}: {node_name}")
+        
+        # Check for corner radius properties
+        radius_props = {}
+        for key in node.keys():
+            if _RADIUS_RE.search(key) is not None:
+                radius_props[key] = node[key]
+        
+        if radius_props:
+            lines.append(f"{indent}   🔵 Radius properties found:")
+            for key, value in radius_props.items():
+                lines.append(f"{indent}      {key}: {value}")
+        
+        # Check for fills
+        if node.get("fills"):
+            lines.append(f"{indent}   🎨 Has fills: {len(node['fills'])} fill(s)")
+        
+        # Check for strokes
+        if node.get("strokes"):
+            lines.append(f"{indent}   ✏️  Has strokes: {len(node['strokes'])} stroke(s)")
+        
+        # Queue children (reversed so they print in order)
+        children = node.get("children") or _EMPTY
+        if children and depth < MAX_DEPTH:  # Limit depth to avoid too much output
+            for child in reversed(children[:10]):  # Limit to first 10 children
+                stack.append((child, depth + 1))
 
 def main():
     if len(sys.argv) < 2:
@@ -65,7 +85,8 @@ def main():
     try:
         converter = FigmaToHTMLConverter(api_key)
         print("📥 Fetching Figma file data...")
-        file_data = converter.get_file_data(file_key)
+        # Only the levels we print are fetched and parsed
+        file_data = converter.get_file_data(file_key, depth=MAX_DEPTH)
         
         print(f"✅ File name: {file_data.get('name', 'Unknown')}")
         print()
@@ -4,50 +4,76 @@ Dump all properties of frames that look like input fields
 """
 
 import os
+import re
 import sys
 import json
 from figma_to_html import FigmaToHTMLConverter
 
+# Shared default for nodes without children, avoids a new list per leaf
+_EMPTY = ()
+
+# Input field size window (exclusive bounds)
+MIN_WIDTH, MAX_WIDTH = 200, 500
+MIN_HEIGHT, MAX_HEIGHT = 40, 100
+
+# Node types whose children may extend past their own bounding box
+_OVERFLOW_TYPES = {"FRAME", "COMPONENT", "COMPONENT_SET", "INSTANCE", "SECTION"}
+
+# Property names that may describe corner rounding
+_CORNER_RE = re.compile(r"corner|radius|round|smooth", re.IGNORECASE)
+
 def dump_frame_properties(node, depth=0):
     """Find and dump properties of input-field-like frames"""
-    node_type = node.get("type", "UNKNOWN")
+    # Buffer the whole report and write it once instead of a print per line
+    lines = []
+    stack = [(node, depth)]
+    while stack:
+        node, depth = stack.pop()
+        node_type = node.get("type", "UNKNOWN")
     
-    # Check if this looks like an input field
-    bbox = node.get("absoluteBoundingBox", {})
-    width = bbox.get("width", 0)
-    height = bbox.get("height", 0)
-    has_border = bool(node.get("strokes"))
+        # Check if this looks like an input field
+        bbox = node.get("absoluteBoundingBox", {})
+        width = bbox.get("width", 0)
+        height = bbox.get("height", 0)
+        has_border = bool(node.get("strokes"))
     
-    # Input field detection
-    if node_type == "FRAME" and has_border and 40 < height < 100 and 200 < width < 500:
-        print("\n" + "="*70)
-        print(f"🎯 INPUT FIELD FRAME FOUND")
-        print(f"   Name: {node.get('name', 'Unnamed')}")
-        print(f"   Size: {width}x{height}")
-        print("="*70)
-        print("\n📋 ALL PROPERTIES (JSON dump):")
-        print("-"*70)
+        # Input field detection
+        if node_type == "FRAME" and has_border and MIN_HEIGHT < height < MAX_HEIGHT and MIN_WIDTH < width < MAX_WIDTH:
+            lines.append("\n" + "="*70)
+            lines.append(f"🎯 INPUT FIELD FRAME FOUND")
+            lines.append(f"   Name: {node.get('name', 'Unnamed')}")
+            lines.append(f"   Size: {width}x{height}")
+            lines.append("="*70)
+            lines.append("\n📋 ALL PROPERTIES (JSON dump):")
+            lines.append("-"*70)
+        
+            # Pretty print all properties except children
+            props = {k: v for k, v in node.items() if k != "children"}
+            lines.append(json.dumps(props, indent=2))
+            lines.append("-"*70)
         
-        # Pretty print all properties except children
-        props = {k: v for k, v in node.items() if k != "children"}
-        print(json.dumps(props, indent=2))
-        print("-"*70)
+            lines.append("\n🔍 CORNER/RADIUS PROPERTIES:")
+            found_any = False
+            for key, value in node.items():
+                if _CORNER_RE.search(key) is not None:
+                    lines.append(f"   ✅ {key}: {value}")
+                    found_any = True
         
-        print("\n🔍 CORNER/RADIUS PROPERTIES:")
-        found_any = False
-        for key, value in node.items():
-            if any(word in key.lower() for word in ["corner", "radius", "round", "smooth"]):
-                print(f"   ✅ {key}: {value}")
-                found_any = True
+            if not found_any:
+                lines.append("   ❌ NO corner or radius properties found!")
         
-        if not found_any:
-            print("   ❌ NO corner or radius properties found!")
+            lines.append("\n" + "="*70)
+    
+        # Skip subtrees that are bounded by a box too small to hold an input field
+        if bbox and (width <= MIN_WIDTH or height <= MIN_HEIGHT) and node_type not in _OVERFLOW_TYPES:
+            continue
         
-        print("\n" + "="*70)
+        # Queue children (reversed so they are visited in order)
+        for child in reversed(node.get("children") or _EMPTY):
+            stack.append((child, depth + 1))
     
-    # Recurse
-    for child in node.get("children", []):
-        dump_frame_properties(child, depth + 1)
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     if len(sys.argv) < 2:
@@ -9,11 +9,111 @@ and generates pixel-perfect HTML/CSS representations.
 import os
 import sys
 import json
+import math
+import re
+import tempfile
 import requests
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from typing import IO, Dict, List, Any, NamedTuple, Optional, Tuple
+from functools import lru_cache
 from enum import Enum
 
+# orjson is an optional, much faster drop-in for decoding large file payloads
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+# Shared immutable default for missing list-valued node properties
+_EMPTY = ()
+
+# Individual corner radius property names, probed in order for each corner
+# (top-left, top-right, bottom-right, bottom-left)
+_CORNER_PROBES = (
+    ("rectangleCornerTopLeftRadius", "topLeftRadius", "cornerTopLeftRadius"),
+    ("rectangleCornerTopRightRadius", "topRightRadius", "cornerTopRightRadius"),
+    ("rectangleCornerBottomRightRadius", "bottomRightRadius", "cornerBottomRightRadius"),
+    ("rectangleCornerBottomLeftRadius", "bottomLeftRadius", "cornerBottomLeftRadius"),
+)
+_ANY_CORNER_KEYS = frozenset(sum(_CORNER_PROBES, ()))
+
+_RAD2DEG = 180.0 / math.pi
+
+# Tags for the two fixed-slot style key layouts, see FigmaToHTMLConverter._style_declarations
+_TEXT_STYLE = "text"
+_BOX_STYLE = "box"
+
+# Document boilerplate, filled in by FigmaToHTMLConverter._document_head via str.format_map
+# (hence the doubled braces in the CSS)
+_DOCUMENT_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Figma to HTML Export</title>
+    {fonts_import}
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+        
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+            background: #f5f5f5;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            min-height: 100vh;
+            padding: 20px;
+        }}
+        
+        #figma-frame {{
+            position: relative;
+            width: {width}px;
+            height: {height}px;
+            background: white;
+            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
+        }}
+        
+        .text-node {{
+            overflow: hidden;
+            word-wrap: break-word;
+            white-space: pre-wrap;
+        }}
+        
+{style_rules}
+    </style>
+</head>
+<body>
+    <div id="figma-frame">
+        """
+
+_FONTS_LINK = '<link href="https://fonts.googleapis.com/css2?family={font_params}:wght@100;200;300;400;500;600;700;800;900&display=swap" rel="stylesheet">'
+
+# Closes the document opened by _DOCUMENT_HEAD
+_DOCUMENT_FOOTER = """
+    </div>
+</body>
+</html>"""
+
+# Figma API connection pool size, also the max number of concurrent requests
+_MAX_CONNECTIONS = 4
+# Max node ids per /images request, keeps the query string a sane length
+_IMAGE_BATCH_SIZE = 100
+
+# Where full file responses are cached, keyed by file key + lastModified
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "figma2html")
+
 
 class NodeType(Enum):
     """Figma node types"""
@@ -35,8 +135,29 @@ class NodeType(Enum):
     INSTANCE = "INSTANCE"
 
 
-@dataclass
-class Color:
+@lru_cache(maxsize=None)
+def _get_env(name: str) -> Optional[str]:
+    """Read an environment variable once per process"""
+    return os.environ.get(name)
+
+
+# Designs reuse a few dozen colors thousands of times, so format each one only once
+@lru_cache(maxsize=8192)
+def _rgb_css(r: float, g: float, b: float) -> str:
+    return f"rgb({int(r * 255)}, {int(g * 255)}, {int(b * 255)})"
+
+
+# typed=True because the alpha is rendered as-is: 0 and 0.0 must not share an entry
+@lru_cache(maxsize=8192, typed=True)
+def _rgba_css(r: float, g: float, b: float, a: float) -> str:
+    return f"rgba({int(r * 255)}, {int(g * 255)}, {int(b * 255)}, {a})"
+
+
+# Two-digit hex for every channel value, indexed by the 0-255 integer
+_HEX_BYTE = tuple(f"{i:02x}" for i in range(256))
+
+
+class Color(NamedTuple):
     """Represents a color with RGBA values"""
     r: float
     g: float
@@ -45,63 +166,161 @@ class Color:
 
     def to_css(self) -> str:
         """Convert to CSS rgba string"""
-        r = int(self.r * 255)
-        g = int(self.g * 255)
-        b = int(self.b * 255)
         if self.a < 1.0:
-            return f"rgba({r}, {g}, {b}, {self.a})"
-        return f"rgb({r}, {g}, {b})"
+            return _rgba_css(self.r, self.g, self.b, self.a)
+        return _rgb_css(self.r, self.g, self.b)
 
     def to_hex(self) -> str:
         """Convert to hex string"""
-        r = int(self.r * 255)
-        g = int(self.g * 255)
-        b = int(self.b * 255)
+        r, g, b = int(self.r * 255), int(self.g * 255), int(self.b * 255)
+        if 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
+            return "#" + _HEX_BYTE[r] + _HEX_BYTE[g] + _HEX_BYTE[b]
+        # Out-of-range channels fall outside the table; format them as before rather than fail
         return f"#{r:02x}{g:02x}{b:02x}"
 
 
 class FigmaToHTMLConverter:
     """Main converter class that handles Figma API interaction and HTML/CSS generation"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, use_cache: bool = True):
         self.api_key = api_key
         self.base_url = "https://api.figma.com/v1"
         self.headers = {"X-Figma-Token": api_key}
         self.image_fills = {}
         self.fonts_used = set()
+        # Interned Color instances, see parse_color
+        self._color_pool = {}
+        # Distinct style keys mapped to their shared CSS class name, and the rendered rules
+        self._style_table = {}
+        self._style_rules = []
+
+        # Reuse one connection pool for all API calls instead of a new TLS handshake each
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=_MAX_CONNECTIONS, pool_maxsize=_MAX_CONNECTIONS,
+                              max_retries=retry)
+        self.session.mount("https://", adapter)
 
-    def get_file_data(self, file_key: str) -> Dict[str, Any]:
-        """Fetch Figma file data from API"""
+        self.use_cache = use_cache
+        self.cache_dir = _CACHE_DIR
+
+    def get_file_data(self, file_key: str, depth: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch Figma file data from API, reusing the on-disk copy if the file is unchanged"""
+        # depth limits the fetched tree to its top levels; a cached full copy is still preferred
+        if not self.use_cache:
+            return self._fetch_file(file_key, depth)
+        
+        # A depth=1 fetch is cheap and tells us which version is current
+        last_modified = self._fetch_file(file_key, depth=1).get("lastModified")
+        if not last_modified:
+            return self._fetch_file(file_key, depth)
+        
+        cache_path = os.path.join(self.cache_dir, f"{file_key}-{last_modified.replace(':', '-')}.json")
+        try:
+            with open(cache_path, "rb") as f:
+                return _loads(f.read())
+        except (OSError, ValueError):
+            pass
+        
+        file_data = self._fetch_file(file_key, depth)
+        # Only complete trees are cached
+        if depth is None:
+            self._write_cache(file_key, cache_path, file_data)
+        return file_data
+
+    def _fetch_file(self, file_key: str, depth: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch Figma file data from API, optionally limited to a tree depth"""
         url = f"{self.base_url}/files/{file_key}"
-        response = requests.get(url, headers=self.headers)
+        if depth is not None:
+            url = f"{url}?depth={depth}"
+        response = self.session.get(url)
         
         if response.status_code != 200:
             raise Exception(f"Failed to fetch Figma file: {response.status_code} - {response.text}")
         
-        return response.json()
+        # Decode the raw bytes so orjson can skip the intermediate str
+        return _loads(response.content)
+
+    def _write_cache(self, file_key: str, cache_path: str, file_data: Dict[str, Any]):
+        """Atomically write file data to the cache, replacing older versions of the same file
+
+        Failures only cost a refetch next time.
+        """
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile("wb", dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                f.write(_dumps(file_data))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # Don't leave a half-written temp file behind
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+        
+        # Only the current version can ever be hit again, so drop the rest
+        prefix = f"{file_key}-"
+        current = os.path.basename(cache_path)
+        try:
+            stale = [name for name in os.listdir(self.cache_dir)
+                     if name.startswith(prefix) and name.endswith(".json") and name != current]
+        except OSError:
+            return
+        for name in stale:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
 
     def get_image_fills(self, file_key: str, node_ids: List[str]) -> Dict[str, str]:
         """Get image URLs for image fills"""
         if not node_ids:
             return {}
         
+        batches = [node_ids[i:i + _IMAGE_BATCH_SIZE] for i in range(0, len(node_ids), _IMAGE_BATCH_SIZE)]
+        if len(batches) == 1:
+            return self._fetch_image_batch(file_key, batches[0])
+        
+        # Large files: fetch the batches concurrently over the pooled session
+        images = {}
+        with ThreadPoolExecutor(max_workers=min(len(batches), _MAX_CONNECTIONS)) as executor:
+            for batch_images in executor.map(lambda ids: self._fetch_image_batch(file_key, ids), batches):
+                images.update(batch_images)
+        return images
+
+    def _fetch_image_batch(self, file_key: str, node_ids: List[str]) -> Dict[str, str]:
+        """Get image URLs for a single batch of node ids"""
         ids_param = ",".join(node_ids)
         url = f"{self.base_url}/images/{file_key}?ids={ids_param}"
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url)
         
         if response.status_code == 200:
-            data = response.json()
+            data = _loads(response.content)
             return data.get("images", {})
         return {}
 
-    def parse_color(self, color_data: Dict[str, float]) -> Color:
-        """Parse Figma color data"""
-        return Color(
-            r=color_data.get("r", 0),
-            g=color_data.get("g", 0),
-            b=color_data.get("b", 0),
-            a=color_data.get("a", 1.0)
-        )
+    def parse_color(self, color_data: Dict[str, float], opacity: Optional[float] = None) -> Color:
+        """Parse Figma color data, folding an optional paint opacity into the alpha"""
+        r = color_data.get("r", 0)
+        g = color_data.get("g", 0)
+        b = color_data.get("b", 0)
+        a = color_data.get("a", 1.0)
+        if opacity is not None:
+            a *= opacity
+        
+        # Shared styles hit the same colors over and over, so hand out one instance per value.
+        # The alpha's type is part of the key since an int alpha renders differently from a float
+        key = (r, g, b, a, type(a))
+        color = self._color_pool.get(key)
+        if color is None:
+            color = self._color_pool[key] = Color(r=r, g=g, b=b, a=a)
+        return color
 
     def get_fills_css(self, fills: List[Dict], node_id: str = "") -> str:
         """Convert Figma fills to CSS background"""
@@ -115,9 +334,7 @@ class FigmaToHTMLConverter:
             fill_type = fill.get("type")
             
             if fill_type == "SOLID":
-                color = self.parse_color(fill.get("color", {}))
-                opacity = fill.get("opacity", 1.0)
-                color.a *= opacity
+                color = self.parse_color(fill.get("color", {}), fill.get("opacity", 1.0))
                 return color.to_css()
             
             elif fill_type == "GRADIENT_LINEAR":
@@ -136,31 +353,29 @@ class FigmaToHTMLConverter:
         gradient_type = gradient_fill.get("type")
         
         if gradient_type == "GRADIENT_LINEAR":
-            stops = gradient_fill.get("gradientStops", [])
-            handles = gradient_fill.get("gradientHandlePositions", [])
+            stops = gradient_fill.get("gradientStops", _EMPTY)
+            handles = gradient_fill.get("gradientHandlePositions", _EMPTY)
             
             if len(handles) >= 2:
                 x1, y1 = handles[0].get("x", 0), handles[0].get("y", 0)
                 x2, y2 = handles[1].get("x", 1), handles[1].get("y", 1)
                 
                 # Calculate angle
-                import math
-                angle = math.atan2(y2 - y1, x2 - x1) * 180 / math.pi + 90
+                angle = math.atan2(y2 - y1, x2 - x1) * _RAD2DEG + 90.0
                 
-                stop_strings = []
-                for stop in stops:
-                    color = self.parse_color(stop.get("color", {}))
-                    position = stop.get("position", 0) * 100
-                    stop_strings.append(f"{color.to_css()} {position:.1f}%")
+                stop_strings = ", ".join([
+                    f"{self.parse_color(stop.get('color', {})).to_css()} {stop.get('position', 0) * 100:.1f}%"
+                    for stop in stops
+                ])
                 
-                return f"linear-gradient({angle:.1f}deg, {', '.join(stop_strings)})"
+                return f"linear-gradient({angle:.1f}deg, {stop_strings})"
         
         # Fallback
         return "transparent"
 
     def get_strokes_css(self, node: Dict) -> Tuple[str, str, str]:
         """Get border CSS properties from strokes"""
-        strokes = node.get("strokes", [])
+        strokes = node.get("strokes", _EMPTY)
         if not strokes or not any(s.get("visible", True) for s in strokes):
             return "", "", ""
         
@@ -174,9 +389,7 @@ class FigmaToHTMLConverter:
         
         # Border color
         if stroke.get("type") == "SOLID":
-            color = self.parse_color(stroke.get("color", {}))
-            opacity = stroke.get("opacity", 1.0)
-            color.a *= opacity
+            color = self.parse_color(stroke.get("color", {}), stroke.get("opacity", 1.0))
             border_color = color.to_css()
         else:
             border_color = "#000000"
@@ -237,30 +450,20 @@ class FigmaToHTMLConverter:
         
         # Check for individual corner radii with multiple possible property name formats
         # Figma might use different naming conventions in some cases
-        corner_names = {
-            "topLeft": ["rectangleCornerTopLeftRadius", "topLeftRadius", "cornerTopLeftRadius"],
-            "topRight": ["rectangleCornerTopRightRadius", "topRightRadius", "cornerTopRightRadius"],
-            "bottomRight": ["rectangleCornerBottomRightRadius", "bottomRightRadius", "cornerBottomRightRadius"],
-            "bottomLeft": ["rectangleCornerBottomLeftRadius", "bottomLeftRadius", "cornerBottomLeftRadius"]
-        }
+        if _ANY_CORNER_KEYS.isdisjoint(node):
+            # If no radius found at all, return 0px
+            return "0px"
         
         radii = []
-        has_any_radius = False
-        
-        for corner in ["topLeft", "topRight", "bottomRight", "bottomLeft"]:
+        for prop_names in _CORNER_PROBES:
             radius = 0
             # Try each possible property name format
-            for prop_name in corner_names[corner]:
+            for prop_name in prop_names:
                 if prop_name in node:
                     radius = node[prop_name]
-                    has_any_radius = True
                     break
             radii.append(radius)
         
-        # If no radius found at all, return 0px
-        if not has_any_radius:
-            return "0px"
-        
         # If all corners are the same (including all 0), return single value
         if all(r == radii[0] for r in radii):
             if radii[0] == 0:
@@ -322,7 +525,7 @@ class FigmaToHTMLConverter:
             styles["text-transform"] = "capitalize"
         
         # Text color
-        fills = node.get("fills", [])
+        fills = node.get("fills", _EMPTY)
         if fills:
             color = self.get_fills_css(fills)
             styles["color"] = color
@@ -330,26 +533,55 @@ class FigmaToHTMLConverter:
         return styles
 
     def node_to_html(self, node: Dict, parent_box: Optional[Dict] = None, depth: int = 0) -> str:
-        """Recursively convert Figma node to HTML"""
+        """Convert a Figma node and its subtree to HTML"""
+        return "".join(self._node_parts(node, parent_box))
+
+    def _node_parts(self, node: Dict, parent_box: Optional[Dict] = None) -> List[str]:
+        """Render a node and its subtree as a list of HTML fragments"""
+        out = []
+        origin = (parent_box.get("x", 0), parent_box.get("y", 0)) if parent_box else None
+        self._emit(node, origin, out)
+        # Every element is preceded by a "\n" separator; drop the leading one
+        del out[:1]
+        return out
+
+    def _emit(self, node: Dict, origin: Optional[Tuple[float, float]], out: List[str]):
+        """Append the HTML for a node and its children to a shared buffer"""
+        # Iterative DFS; a (None, mark) entry closes the container opened at buffer length `mark`
+        stack = [(node, origin)]
+        while stack:
+            node, origin = stack.pop()
+            if node is None:
+                out.append("\n</div>" if len(out) > origin else "</div>")
+                continue
+            
+            # Skip invisible nodes
+            if not node.get("visible", True):
+                continue
+            
+            children = node.get("children") or _EMPTY
+            
+            # Get node bounds
+            bbox = node.get("absoluteBoundingBox")
+            if not bbox:
+                # If no bounding box, try to process children
+                stack.extend((child, origin) for child in reversed(children))
+                continue
+            
+            child_origin = self._emit_node(node, bbox, origin, out)
+            if child_origin:
+                # All children share the container's origin; pushed in reverse to pop in document order
+                stack.append((None, len(out)))
+                stack.extend((child, child_origin) for child in reversed(children))
+
+    def _emit_node(self, node: Dict, bbox: Dict, origin: Optional[Tuple[float, float]],
+                   out: List[str]) -> Optional[Tuple[float, float]]:
+        """Append a single node's markup; returns its children's origin if a container was opened"""
         node_type = node.get("type")
         node_id = node.get("id", "")
         node_name = node.get("name", "")
-        
-        # Skip invisible nodes
-        if not node.get("visible", True):
-            return ""
-        
-        # Get node bounds
-        bbox = node.get("absoluteBoundingBox", {})
-        if not bbox:
-            # If no bounding box, try to process children
-            children = node.get("children", [])
-            html_parts = []
-            for child in children:
-                child_html = self.node_to_html(child, parent_box, depth)
-                if child_html:
-                    html_parts.append(child_html)
-            return "\n".join(html_parts)
+        fills = node.get("fills", _EMPTY)
+        effects = node.get("effects", _EMPTY)
         
         x = bbox.get("x", 0)
         y = bbox.get("y", 0)
@@ -357,119 +589,142 @@ class FigmaToHTMLConverter:
         height = bbox.get("height", 0)
         
         # Calculate relative position
-        if parent_box:
-            rel_x = x - parent_box.get("x", 0)
-            rel_y = y - parent_box.get("y", 0)
+        if origin:
+            rel_x = x - origin[0]
+            rel_y = y - origin[1]
         else:
             rel_x = x
             rel_y = y
-            parent_box = bbox
         
-        # Start building styles
-        styles = {
-            "position": "absolute",
-            "left": f"{rel_x}px",
-            "top": f"{rel_y}px",
-            "width": f"{width}px",
-            "height": f"{height}px",
-        }
+        # Geometry is unique per node so it stays inline; everything else goes to a shared class
+        geometry = f"left: {rel_x}px; top: {rel_y}px; width: {width}px; height: {height}px"
         
         # Handle different node types
         if node_type == "TEXT":
             # Text node
             text_content = node.get("characters", "")
             text_styles = self.get_text_styles(node)
-            styles.update(text_styles)
             
             # Background
-            fills = node.get("fills", [])
+            background = None
             if fills and fills[0].get("type") != "SOLID":
                 bg = self.get_fills_css(fills, node_id)
                 if bg != "transparent":
-                    styles["background"] = bg
+                    background = bg
             
             # Effects
-            effects = node.get("effects", [])
+            text_shadow = None
             if effects:
                 shadows = [e for e in self.get_effects_css(effects) if "blur" not in e]
                 if shadows:
-                    styles["text-shadow"] = ", ".join(shadows)
+                    text_shadow = ", ".join(shadows)
             
             # Build HTML
-            style_str = "; ".join(f"{k}: {v}" for k, v in styles.items())
-            return f'<div class="text-node" style="{style_str}">{text_content}</div>'
+            class_name = self._style_class((_TEXT_STYLE, tuple(text_styles.items()), background, text_shadow))
+            out.append("\n")
+            out.append(f'<div class="text-node {class_name}" style="{geometry}">')
+            out.append(text_content)
+            out.append("</div>")
+            return None
         
         else:
             # Container node (FRAME, GROUP, RECTANGLE, etc.)
             
             # Background/Fill
-            fills = node.get("fills", [])
-            if fills:
-                bg = self.get_fills_css(fills, node_id)
-                styles["background"] = bg
+            background = self.get_fills_css(fills, node_id) if fills else None
             
             # Border/Stroke
+            border = None
             border_width, border_style, border_color = self.get_strokes_css(node)
             if border_width:
-                styles["border"] = f"{border_width} {border_style} {border_color}"
+                border = f"{border_width} {border_style} {border_color}"
             
             # Border radius - check for any type of corner radius
             border_radius = self.get_border_radius(node)
-            if border_radius != "0px":
-                styles["border-radius"] = border_radius
-                # Add overflow hidden to prevent children from breaking rounded corners
-                styles["overflow"] = "hidden"
+            if border_radius == "0px":
+                border_radius = None
             
             # Effects (shadows)
-            effects = node.get("effects", [])
+            box_shadow = None
             if effects:
                 css_effects = self.get_effects_css(effects)
                 shadows = [e for e in css_effects if "blur" not in e]
                 if shadows:
-                    styles["box-shadow"] = ", ".join(shadows)
+                    box_shadow = ", ".join(shadows)
             
             # Opacity
             opacity = node.get("opacity", 1.0)
-            if opacity < 1.0:
-                styles["opacity"] = str(opacity)
-            
-            # Build style string
-            style_str = "; ".join(f"{k}: {v}" for k, v in styles.items())
-            
-            # Process children
-            children = node.get("children", [])
-            children_html = []
-            for child in children:
-                child_html = self.node_to_html(child, bbox, depth + 1)
-                if child_html:
-                    children_html.append(child_html)
+            opacity_css = str(opacity) if opacity < 1.0 else None
             
             # Build HTML
-            class_name = f"{node_type.lower()}-node"
-            if children_html:
-                children_str = "\n".join(children_html)
-                return f'<div class="{class_name}" style="{style_str}">\n{children_str}\n</div>'
-            else:
-                return f'<div class="{class_name}" style="{style_str}"></div>'
-
-    def find_frames(self, node: Dict, frames: List[Dict] = None) -> List[Dict]:
-        """Find all top-level frames in the document"""
+            class_name = self._style_class((_BOX_STYLE, background, border, border_radius, box_shadow, opacity_css))
+            out.append("\n")
+            out.append(f'<div class="{node_type.lower()}-node {class_name}" style="{geometry}">')
+            return x, y
+
+    def _reset_styles(self):
+        """Forget the shared style classes so a new document only carries its own rules"""
+        self._style_table = {}
+        self._style_rules = []
+
+    def _style_class(self, key: Tuple) -> str:
+        """Get the shared CSS class for a style key, rendering its rule on first use"""
+        class_name = self._style_table.get(key)
+        if class_name is None:
+            class_name = self._style_table[key] = f"s{len(self._style_table)}"
+            self._style_rules.append(f".{class_name} {{ {'; '.join(self._style_declarations(key))}; }}")
+        return class_name
+
+    @staticmethod
+    def _style_declarations(key: Tuple) -> List[str]:
+        """Expand a fixed-slot style key into CSS declarations; None slots are omitted"""
+        declarations = ["position: absolute"]
+        if key[0] == _TEXT_STYLE:
+            _, text_styles, background, text_shadow = key
+            declarations.extend(f"{k}: {v}" for k, v in text_styles)
+            if background is not None:
+                declarations.append(f"background: {background}")
+            if text_shadow is not None:
+                declarations.append(f"text-shadow: {text_shadow}")
+            return declarations
+        
+        _, background, border, border_radius, box_shadow, opacity = key
+        if background is not None:
+            declarations.append(f"background: {background}")
+        if border is not None:
+            declarations.append(f"border: {border}")
+        if border_radius is not None:
+            declarations.append(f"border-radius: {border_radius}")
+            # Add overflow hidden to prevent children from breaking rounded corners
+            declarations.append("overflow: hidden")
+        if box_shadow is not None:
+            declarations.append(f"box-shadow: {box_shadow}")
+        if opacity is not None:
+            declarations.append(f"opacity: {opacity}")
+        return declarations
+
+    def find_frames(self, node: Dict, frames: List[Dict] = None, top_level_only: bool = False) -> List[Dict]:
+        """Find all frames in the document, or only the outermost ones with top_level_only"""
         if frames is None:
             frames = []
         
-        node_type = node.get("type")
-        
-        if node_type == "FRAME" and node.get("visible", True):
-            frames.append(node)
-        
-        # Recurse into children
-        for child in node.get("children", []):
-            self.find_frames(child, frames)
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            
+            if node.get("type") == "FRAME" and node.get("visible", True):
+                frames.append(node)
+                if top_level_only:
+                    continue
+            
+            # Push children in reverse so frames are found in document order
+            stack.extend(reversed(node.get("children") or _EMPTY))
         
         return frames
 
-    def generate_html(self, file_key: str, frame_name: Optional[str] = None) -> str:
-        """Generate complete HTML from Figma file"""
+    def generate_html(self, file_key: str, frame_name: Optional[str] = None,
+                      out: Optional[IO[str]] = None) -> Optional[str]:
+        """Generate complete HTML from Figma file, returned as a string or written to `out`"""
         print(f"Fetching Figma file data...")
         file_data = self.get_file_data(file_key)
         
@@ -503,87 +758,117 @@ class FigmaToHTMLConverter:
         
         # Convert frame to HTML
         print("Generating HTML...")
-        body_html = self.node_to_html(selected_frame)
+        self._reset_styles()
+        body_parts = self._node_parts(selected_frame)
         
         # Get frame dimensions
-        bbox = selected_frame.get("absoluteBoundingBox", {})
-        frame_width = bbox.get("width", 800)
-        frame_height = bbox.get("height", 600)
+        frame_width, frame_height = self._frame_size(selected_frame)
         
         # Build complete HTML
-        html = self.build_complete_html(body_html, frame_width, frame_height)
-        
-        return html
+        if out is None:
+            return self.build_complete_html("".join(body_parts), frame_width, frame_height)
+        
+        # The head depends on the styles and fonts collected from the body, so it is written
+        # after rendering; the body fragments are streamed rather than joined into one string
+        out.write(self._document_head(frame_width, frame_height))
+        out.writelines(body_parts)
+        out.write(_DOCUMENT_FOOTER)
+        return None
 
-    def collect_image_nodes(self, node: Dict, image_nodes: List[str]):
-        """Recursively collect nodes with image fills"""
-        node_id = node.get("id")
-        fills = node.get("fills", [])
+    def generate_all_html(self, file_key: str) -> List[Tuple[str, str]]:
+        """Generate one complete HTML document per top-level frame, as (frame name, html) pairs"""
+        print(f"Fetching Figma file data...")
+        file_data = self.get_file_data(file_key)
         
-        for fill in fills:
-            if fill.get("type") == "IMAGE" and fill.get("visible", True):
-                image_nodes.append(node_id)
-                break
+        frames = self.find_frames(file_data.get("document", {}), top_level_only=True)
+        if not frames:
+            raise Exception("No frames found in the Figma file")
         
-        for child in node.get("children", []):
-            self.collect_image_nodes(child, image_nodes)
+        # Fetch image fills for every frame in one go so workers never hit the API
+        image_nodes = []
+        for frame in frames:
+            self.collect_image_nodes(frame, image_nodes)
+        if image_nodes:
+            print(f"Fetching {len(image_nodes)} image fills...")
+            self.image_fills = self.get_image_fills(file_key, image_nodes)
+        
+        print(f"Generating HTML for {len(frames)} frames...")
+        if len(frames) == 1:
+            results = [self.frame_to_html(frames[0])]
+        else:
+            # Frames share nothing writable, so convert them in parallel across cores
+            with ProcessPoolExecutor(initializer=_init_frame_worker, initargs=(self.image_fills,)) as executor:
+                results = list(executor.map(_convert_frame, frames))
+            for _, fonts_used in results:
+                self.fonts_used.update(fonts_used)
+            results = [html for html, _ in results]
+        
+        return [(frame.get("name", ""), html) for frame, html in zip(frames, results)]
+
+    def frame_to_html(self, frame: Dict) -> str:
+        """Build a complete HTML document for a single frame"""
+        frame_width, frame_height = self._frame_size(frame)
+        self._reset_styles()
+        return self.build_complete_html(self.node_to_html(frame), frame_width, frame_height)
+
+    @staticmethod
+    def _frame_size(frame: Dict) -> Tuple[float, float]:
+        """Get frame dimensions, defaulting to 800x600"""
+        bbox = frame.get("absoluteBoundingBox", {})
+        return bbox.get("width", 800), bbox.get("height", 600)
+
+    def collect_image_nodes(self, node: Dict, image_nodes: List[str]):
+        """Collect nodes with image fills in document order"""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            
+            for fill in node.get("fills") or _EMPTY:
+                if fill.get("type") == "IMAGE" and fill.get("visible", True):
+                    image_nodes.append(node.get("id"))
+                    break
+            
+            stack.extend(reversed(node.get("children") or _EMPTY))
 
     def build_complete_html(self, body_content: str, width: float, height: float) -> str:
         """Build complete HTML document with CSS"""
-        
+        return "".join((self._document_head(width, height), body_content, _DOCUMENT_FOOTER))
+
+    def _document_head(self, width: float, height: float) -> str:
+        """Build the document up to the point where the frame content goes"""
         # Google Fonts import for used fonts
         fonts_import = ""
         if self.fonts_used:
             font_params = "|".join(f.replace(" ", "+") for f in self.fonts_used)
-            fonts_import = f'<link href="https://fonts.googleapis.com/css2?family={font_params}:wght@100;200;300;400;500;600;700;800;900&display=swap" rel="stylesheet">'
+            fonts_import = _FONTS_LINK.format(font_params=font_params)
         
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Figma to HTML Export</title>
-    {fonts_import}
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: #f5f5f5;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        #figma-frame {{
-            position: relative;
-            width: {width}px;
-            height: {height}px;
-            background: white;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-        }}
-        
-        .text-node {{
-            overflow: hidden;
-            word-wrap: break-word;
-            white-space: pre-wrap;
-        }}
-    </style>
-</head>
-<body>
-    <div id="figma-frame">
-        {body_content}
-    </div>
-</body>
-</html>"""
+        # Shared node style classes collected while generating the body
+        style_rules = "\n".join(f"        {rule}" for rule in self._style_rules)
         
-        return html
+        return _DOCUMENT_HEAD.format_map({
+            "fonts_import": fonts_import,
+            "style_rules": style_rules,
+            "width": width,
+            "height": height,
+        })
+
+
+# Image URLs handed to each ProcessPoolExecutor worker once, see generate_all_html
+_worker_image_fills = {}
+
+
+def _init_frame_worker(image_fills: Dict[str, str]):
+    """Store the shared image URLs in a frame conversion worker"""
+    global _worker_image_fills
+    _worker_image_fills = image_fills
+
+
+def _convert_frame(frame: Dict) -> Tuple[str, set]:
+    """Convert one frame in a worker process; returns the HTML and the fonts it used"""
+    converter = FigmaToHTMLConverter("", use_cache=False)
+    converter.image_fills = _worker_image_fills
+    html = converter.frame_to_html(frame)
+    return html, converter.fonts_used
 
 
 def main():
@@ -592,28 +877,48 @@ def main():
     
     parser = argparse.ArgumentParser(description="Convert Figma designs to HTML/CSS")
     parser.add_argument("file_key", help="Figma file key (from the URL)")
-    parser.add_argument("--frame", help="Specific frame name to export (optional)")
+    # A single named frame and every frame can't both be exported
+    frame_group = parser.add_mutually_exclusive_group()
+    frame_group.add_argument("--frame", help="Specific frame name to export (optional)")
+    frame_group.add_argument("--all-frames", action="store_true",
+                             help="Export every top-level frame to its own file in a directory named after --output")
     parser.add_argument("--output", default="output.html", help="Output HTML file path")
     parser.add_argument("--api-key", help="Figma API key (or set FIGMA_API_KEY env var)")
+    parser.add_argument("--no-cache", action="store_true", help="Always refetch the file instead of using the local cache")
     
     args = parser.parse_args()
     
     # Get API key
-    api_key = args.api_key or os.environ.get("FIGMA_API_KEY")
+    api_key = args.api_key or _get_env("FIGMA_API_KEY")
     if not api_key:
         print("Error: Figma API key required. Set FIGMA_API_KEY environment variable or use --api-key")
         sys.exit(1)
     
     try:
         # Create converter
-        converter = FigmaToHTMLConverter(api_key)
-        
-        # Generate HTML
-        html = converter.generate_html(args.file_key, args.frame)
-        
-        # Write to file
-        with open(args.output, "w", encoding="utf-8") as f:
-            f.write(html)
+        converter = FigmaToHTMLConverter(api_key, use_cache=not args.no_cache)
+        
+        if args.all_frames:
+            output_dir = os.path.splitext(args.output)[0]
+            os.makedirs(output_dir, exist_ok=True)
+            for index, (name, html) in enumerate(converter.generate_all_html(args.file_key), 1):
+                slug = re.sub(r"[^\w-]+", "-", name).strip("-") or "frame"
+                with open(os.path.join(output_dir, f"{index:02d}-{slug}.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+            
+            print(f"\n✅ Successfully generated: {output_dir}/")
+            print(f"   Fonts used: {', '.join(converter.fonts_used) if converter.fonts_used else 'None'}")
+            return
+        
+        # Generate HTML straight into the output file; a failed run leaves any old output intact
+        tmp_output = f"{args.output}.tmp"
+        try:
+            with open(tmp_output, "w", encoding="utf-8") as f:
+                converter.generate_html(args.file_key, args.frame, out=f)
+            os.replace(tmp_output, args.output)
+        finally:
+            if os.path.exists(tmp_output):
+                os.remove(tmp_output)
         
         print(f"\n✅ Successfully generated: {args.output}")
         print(f"   Fonts used: {', '.join(converter.fonts_used) if converter.fonts_used else 'None'}")
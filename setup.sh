@@ -58,17 +58,17 @@ echo ""
 
 # Run tests
 echo "Running tests..."
-if python3 test_converter.py > /dev/null 2>&1; then
+if python3 -m pytest -q > /dev/null 2>&1; then
     echo "✅ All tests passed"
 else
     echo "⚠️  Some tests failed. Running with output:"
-    python3 test_converter.py
+    python3 -m pytest
 fi
 echo ""
 
 # Make scripts executable
 echo "Making scripts executable..."
-chmod +x convert.sh test_converter.py 2>/dev/null
+chmod +x convert.sh 2>/dev/null
 echo "✅ Scripts are executable"
 echo ""
 
@@ -1,227 +1,316 @@
 #!/usr/bin/env python3
 """
-Test script for Figma to HTML converter
-Run this to validate the converter works correctly
+Test suite for Figma to HTML converter
+Run with: python3 -m pytest (add -n auto to run in parallel, --lf to rerun failures)
 """
 
-import sys
 import os
+import sys
+import json
+import random
+
+import pytest
+
+from figma_to_html import FigmaToHTMLConverter, Color, NodeType
+
+# Read once at import time
+_FIGMA_API_KEY = os.environ.get("FIGMA_API_KEY")
+
 
 def test_imports():
     """Test that all required modules can be imported"""
-    print("Testing imports...")
-    try:
-        import requests
-        print("  ✅ requests module available")
-    except ImportError:
-        print("  ❌ requests module missing - run: pip install requests")
-        return False
-    
-    try:
-        import json
-        import dataclasses
-        import enum
-        print("  ✅ Standard library modules available")
-    except ImportError as e:
-        print(f"  ❌ Standard library import error: {e}")
-        return False
-    
-    return True
+    import requests
+    import json
+    import dataclasses
+    import enum
 
 
 def test_converter_import():
     """Test that the converter module can be imported"""
-    print("\nTesting converter import...")
-    try:
-        from figma_to_html import FigmaToHTMLConverter, Color, NodeType
-        print("  ✅ Converter module imported successfully")
-        return True
-    except ImportError as e:
-        print(f"  ❌ Failed to import converter: {e}")
-        return False
-    except Exception as e:
-        print(f"  ❌ Error importing converter: {e}")
-        return False
+    assert callable(FigmaToHTMLConverter)
+    assert NodeType.FRAME.value == "FRAME"
 
 
 def test_color_conversion():
     """Test color conversion utilities"""
-    print("\nTesting color conversion...")
-    try:
-        from figma_to_html import Color
-        
-        # Test RGB conversion
-        color = Color(r=1.0, g=0.5, b=0.0, a=1.0)
-        css = color.to_css()
-        assert css == "rgb(255, 127, 0)", f"Expected 'rgb(255, 127, 0)', got '{css}'"
-        print(f"  ✅ RGB conversion: {css}")
-        
-        # Test RGBA conversion
-        color_alpha = Color(r=1.0, g=0.5, b=0.0, a=0.5)
-        css_alpha = color_alpha.to_css()
-        assert "rgba" in css_alpha and "0.5" in css_alpha
-        print(f"  ✅ RGBA conversion: {css_alpha}")
-        
-        # Test hex conversion
-        hex_color = color.to_hex()
-        assert hex_color == "#ff7f00", f"Expected '#ff7f00', got '{hex_color}'"
-        print(f"  ✅ Hex conversion: {hex_color}")
-        
-        return True
-    except AssertionError as e:
-        print(f"  ❌ Assertion failed: {e}")
-        return False
-    except Exception as e:
-        print(f"  ❌ Error in color conversion: {e}")
-        return False
+    # Test RGB conversion
+    color = Color(r=1.0, g=0.5, b=0.0, a=1.0)
+    css = color.to_css()
+    assert css == "rgb(255, 127, 0)", f"Expected 'rgb(255, 127, 0)', got '{css}'"
+
+    # Test RGBA conversion
+    color_alpha = Color(r=1.0, g=0.5, b=0.0, a=0.5)
+    css_alpha = color_alpha.to_css()
+    assert "rgba" in css_alpha and "0.5" in css_alpha
+
+    # Test hex conversion
+    hex_color = color.to_hex()
+    assert hex_color == "#ff7f00", f"Expected '#ff7f00', got '{hex_color}'"
+
+    # Lock the formatting contract across many channel values
+    rng = random.Random(0)
+    for _ in range(100000):
+        r, g, b = rng.random(), rng.random(), rng.random()
+        a = rng.choice([1.0, rng.random()])
+        sample = Color(r=r, g=g, b=b, a=a)
+        r255, g255, b255 = int(r * 255), int(g * 255), int(b * 255)
+        expected_css = f"rgba({r255}, {g255}, {b255}, {a})" if a < 1.0 else f"rgb({r255}, {g255}, {b255})"
+        assert sample.to_css() == expected_css, f"Expected '{expected_css}', got '{sample.to_css()}'"
+        assert sample.to_hex() == f"#{r255:02x}{g255:02x}{b255:02x}"
+    assert Color(r=1.0, g=1.0, b=1.0).to_hex() == "#ffffff"
+    assert Color(r=0.0, g=0.0, b=0.0).to_hex() == "#000000"
+
+    # Channels outside 0-1 keep the plain %02x formatting instead of indexing past the table
+    assert Color(r=1.5, g=0.5, b=0.0).to_hex() == "#17e7f00"
+    assert Color(r=-0.1, g=0.0, b=1.0).to_hex() == "#-1900ff"
+
+
+def test_parse_color(converter):
+    """Test that pooled colors format like plain Color instances"""
+    for data, opacity in [({"r": 1.0, "g": 0.5, "b": 0.0}, None), ({"r": 0.2, "g": 0.4, "b": 0.6, "a": 1}, 0.5),
+                          ({"r": 0.0, "g": 0.0, "b": 0.0, "a": 0}, None), ({"r": 1, "g": 1, "b": 1, "a": 1}, None)]:
+        color = converter.parse_color(data, opacity)
+        assert isinstance(color, Color)
+        assert color is converter.parse_color(data, opacity)
+        assert color.to_css() == Color(*color).to_css()
+        assert color.to_hex() == Color(*color).to_hex()
+        # Deriving a new alpha the NamedTuple way must change the format too
+        assert color._replace(a=0.5).to_css() == Color(*color[:3], 0.5).to_css()
 
 
 def test_api_key_detection():
     """Test API key detection"""
-    print("\nTesting API key detection...")
-    api_key = os.environ.get("FIGMA_API_KEY")
-    if api_key:
-        print(f"  ✅ FIGMA_API_KEY found (length: {len(api_key)})")
-        return True
-    else:
-        print("  ⚠️  FIGMA_API_KEY not set in environment")
-        print("     This is OK for testing, but required for actual conversion")
-        return True  # Not a failure, just a warning
-
-
-def test_converter_instantiation():
+    # Not a failure: the key is only required for actual conversion
+    if not _FIGMA_API_KEY:
+        pytest.skip("FIGMA_API_KEY not set in environment")
+
+
+def test_converter_instantiation(converter):
     """Test that converter can be instantiated"""
-    print("\nTesting converter instantiation...")
-    try:
-        from figma_to_html import FigmaToHTMLConverter
-        converter = FigmaToHTMLConverter("test_api_key")
-        print("  ✅ Converter instantiated successfully")
-        
-        # Check attributes
-        assert hasattr(converter, 'get_file_data')
-        assert hasattr(converter, 'generate_html')
-        assert hasattr(converter, 'node_to_html')
-        print("  ✅ Required methods present")
-        
-        return True
-    except Exception as e:
-        print(f"  ❌ Error instantiating converter: {e}")
-        return False
-
-
-def test_style_methods():
+    assert hasattr(converter, 'get_file_data')
+    assert hasattr(converter, 'generate_html')
+    assert hasattr(converter, 'node_to_html')
+
+
+def test_style_methods(converter):
     """Test style conversion methods"""
-    print("\nTesting style conversion methods...")
-    try:
-        from figma_to_html import FigmaToHTMLConverter
-        converter = FigmaToHTMLConverter("test_api_key")
-        
-        # Test fills conversion
-        solid_fill = [{
-            "type": "SOLID",
-            "visible": True,
-            "color": {"r": 1.0, "g": 0.0, "b": 0.0, "a": 1.0}
-        }]
-        result = converter.get_fills_css(solid_fill)
-        assert "rgb" in result or "#" in result
-        print(f"  ✅ Solid fill conversion: {result}")
-        
-        # Test empty fills
-        empty_result = converter.get_fills_css([])
-        assert empty_result == "transparent"
-        print(f"  ✅ Empty fill conversion: {empty_result}")
-        
-        # Test border radius
-        node_with_radius = {"cornerRadius": 10}
-        radius = converter.get_border_radius(node_with_radius)
-        assert radius == "10px"
-        print(f"  ✅ Border radius conversion: {radius}")
-        
-        return True
-    except Exception as e:
-        print(f"  ❌ Error in style methods: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_html_structure():
+    # Test fills conversion
+    solid_fill = [{
+        "type": "SOLID",
+        "visible": True,
+        "color": {"r": 1.0, "g": 0.0, "b": 0.0, "a": 1.0}
+    }]
+    result = converter.get_fills_css(solid_fill)
+    assert "rgb" in result or "#" in result
+
+    # Test empty fills
+    empty_result = converter.get_fills_css([])
+    assert empty_result == "transparent"
+
+    # Test border radius
+    node_with_radius = {"cornerRadius": 10}
+    radius = converter.get_border_radius(node_with_radius)
+    assert radius == "10px"
+
+    # Test individual corner radii
+    assert converter.get_border_radius({}) == "0px"
+    corners = converter.get_border_radius({"topLeftRadius": 8, "cornerBottomRightRadius": 4})
+    assert corners == "8px 0px 4px 0px", f"Expected '8px 0px 4px 0px', got '{corners}'"
+
+
+def test_html_structure(converter):
     """Test HTML generation structure"""
-    print("\nTesting HTML generation...")
-    try:
-        from figma_to_html import FigmaToHTMLConverter
-        converter = FigmaToHTMLConverter("test_api_key")
-        
-        # Test complete HTML generation structure
-        sample_content = '<div>Test</div>'
-        html = converter.build_complete_html(sample_content, 800, 600)
-        
-        assert '<!DOCTYPE html>' in html
-        assert '<html' in html
-        assert '<head>' in html
-        assert '<body>' in html
-        assert sample_content in html
-        assert '800px' in html
-        assert '600px' in html
-        
-        print("  ✅ HTML structure valid")
-        print("  ✅ Content injection works")
-        print("  ✅ Dimensions properly set")
-        
-        return True
-    except Exception as e:
-        print(f"  ❌ Error in HTML generation: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def run_all_tests():
-    """Run all tests and report results"""
-    print("=" * 60)
-    print("  Figma to HTML Converter - Test Suite")
-    print("=" * 60)
-    
-    tests = [
-        ("Import Test", test_imports),
-        ("Converter Import", test_converter_import),
-        ("Color Conversion", test_color_conversion),
-        ("API Key Detection", test_api_key_detection),
-        ("Converter Instantiation", test_converter_instantiation),
-        ("Style Methods", test_style_methods),
-        ("HTML Generation", test_html_structure),
+    sample_content = '<div>Test</div>'
+    html = converter.build_complete_html(sample_content, 800, 600)
+
+    assert '<!DOCTYPE html>' in html
+    assert '<html' in html
+    assert '<head>' in html
+    assert '<body>' in html
+    assert sample_content in html
+    assert '800px' in html
+    assert '600px' in html
+
+
+def _rect(node_id, x, y, color=(1.0, 0.0, 0.0)):
+    """Minimal RECTANGLE node with a solid fill"""
+    r, g, b = color
+    return {
+        "id": node_id, "type": "RECTANGLE", "name": f"Rect {node_id}",
+        "absoluteBoundingBox": {"x": x, "y": y, "width": 50, "height": 20},
+        "fills": [{"type": "SOLID", "color": {"r": r, "g": g, "b": b, "a": 1.0}}],
+    }
+
+
+def _frame(node_id, name, children=(), width=200, height=100):
+    """Minimal FRAME node at the origin"""
+    return {
+        "id": node_id, "type": "FRAME", "name": name,
+        "absoluteBoundingBox": {"x": 0, "y": 0, "width": width, "height": height},
+        "children": list(children),
+    }
+
+
+def test_node_to_html_shared_styles(converter):
+    """Test that identical nodes share one style rule while geometry stays inline"""
+    frame = _frame("1:1", "Shared", [_rect("1:2", 10, 10), _rect("1:3", 10, 40), _rect("1:4", 10, 70, (0.0, 0.0, 1.0))])
+    html = converter.frame_to_html(frame)
+
+    # One rule for the frame, one for the two red rectangles, one for the blue one
+    assert len(converter._style_rules) == 3
+    assert html.count("background: rgb(255, 0, 0)") == 1
+    assert html.count('<div class="rectangle-node s1" style="left: 10px; top: ') == 2
+    assert 'style="left: 10px; top: 40px; width: 50px; height: 20px"' in html
+    assert '<div class="rectangle-node s2" style="left: 10px; top: 70px; width: 50px; height: 20px">' in html
+
+
+def test_frame_to_html_resets_styles(converter):
+    """Test that each document only carries the style rules it uses"""
+    converter.frame_to_html(_frame("2:1", "Busy", [_rect(f"2:{i}", i, i, (i / 10, 0.0, 0.0)) for i in range(2, 6)]))
+    html = converter.frame_to_html(_frame("3:1", "Empty"))
+
+    assert len(converter._style_rules) == 1
+    assert html.count("{ position: absolute") == 1
+
+
+def _text(node_id, x, y, characters, font_family):
+    """Minimal TEXT node"""
+    return {
+        "id": node_id, "type": "TEXT", "name": characters, "characters": characters,
+        "absoluteBoundingBox": {"x": x, "y": y, "width": 100, "height": 20},
+        "style": {"fontFamily": font_family, "fontSize": 14},
+        "fills": [{"type": "SOLID", "color": {"r": 0.0, "g": 0.0, "b": 0.0, "a": 1.0}}],
+    }
+
+
+def _multi_frame_document():
+    """Document with three top-level frames, one of them holding a nested frame"""
+    image_rect = _rect("4:3", 5, 5)
+    image_rect["fills"] = [{"type": "IMAGE"}]
+    frames = [
+        _frame("4:1", "Login", [_frame("4:2", "Nested", [image_rect]), _text("4:4", 10, 50, "Sign in", "Inter")]),
+        _frame("5:1", "Signup", [_rect("5:2", 10, 10), _text("5:3", 10, 40, "Join", "Roboto")]),
+        _frame("6:1", "Empty"),
     ]
-    
-    results = []
-    for name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((name, result))
-        except Exception as e:
-            print(f"\n❌ Test '{name}' crashed: {e}")
-            results.append((name, False))
-    
-    # Summary
-    print("\n" + "=" * 60)
-    print("  Test Summary")
-    print("=" * 60)
-    
-    passed = sum(1 for _, result in results if result)
-    total = len(results)
-    
-    for name, result in results:
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"  {status}: {name}")
-    
-    print(f"\n  Results: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("\n  🎉 All tests passed! The converter is ready to use.")
-        return 0
-    else:
-        print("\n  ⚠️  Some tests failed. Please check the errors above.")
-        return 1
+    return {"document": {"id": "0:0", "type": "DOCUMENT", "children": [
+        {"id": "0:1", "type": "CANVAS", "name": "Page 1", "children": frames},
+    ]}}
+
+
+def test_find_frames_top_level_only(converter):
+    """Test that top_level_only skips frames nested inside other frames"""
+    document = _multi_frame_document()["document"]
+    assert [f["id"] for f in converter.find_frames(document)] == ["4:1", "4:2", "5:1", "6:1"]
+    assert [f["id"] for f in converter.find_frames(document, top_level_only=True)] == ["4:1", "5:1", "6:1"]
+
+
+def test_generate_all_html(monkeypatch):
+    """Test that the parallel all-frames export matches converting each frame on its own"""
+    file_data = _multi_frame_document()
+    image_fills = {"4:3": "https://example.com/image.png"}
+    converter = FigmaToHTMLConverter("test_api_key", use_cache=False)
+    monkeypatch.setattr(converter, "get_file_data", lambda file_key: file_data)
+    monkeypatch.setattr(converter, "get_image_fills", lambda file_key, node_ids: {i: image_fills[i] for i in node_ids})
+
+    results = converter.generate_all_html("file_key")
+
+    # One document per top-level frame, in document order
+    assert [name for name, _ in results] == ["Login", "Signup", "Empty"]
+    frames = converter.find_frames(file_data["document"], top_level_only=True)
+    for frame, (_, html) in zip(frames, results):
+        reference = FigmaToHTMLConverter("test_api_key", use_cache=False)
+        reference.image_fills = image_fills
+        assert html == reference.frame_to_html(frame)
+    assert "https://example.com/image.png" in results[0][1]
+    assert converter.fonts_used == {"Inter", "Roboto"}
+
+
+class _FakeResponse:
+    """Just enough of requests.Response for _fetch_file"""
+    status_code = 200
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+
+
+class _FakeSession:
+    """Records requested URLs and answers with a fixed file payload"""
+
+    def __init__(self, file_data):
+        self.file_data = file_data
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        return _FakeResponse(self.file_data)
+
+
+def _caching_converter(tmp_path, file_data):
+    """Converter with the disk cache enabled in a temp dir and a fake API session"""
+    converter = FigmaToHTMLConverter("test_api_key")
+    converter.cache_dir = str(tmp_path)
+    converter.session = _FakeSession(file_data)
+    return converter
+
+
+def test_file_cache_roundtrip(tmp_path):
+    """Test the probe, miss, write, then hit sequence of the file cache"""
+    file_data = {"lastModified": "2024-01-02T03:04:05Z", "document": {"id": "0:0", "type": "DOCUMENT"}}
+    converter = _caching_converter(tmp_path, file_data)
+
+    # Miss: depth=1 probe, full fetch, then the response is written to the cache
+    assert converter.get_file_data("KEY") == file_data
+    assert converter.session.urls == [f"{converter.base_url}/files/KEY?depth=1", f"{converter.base_url}/files/KEY"]
+    assert os.listdir(tmp_path) == ["KEY-2024-01-02T03-04-05Z.json"]
+
+    # Hit: only the probe goes to the API
+    converter.session.urls.clear()
+    assert converter.get_file_data("KEY") == file_data
+    assert converter.session.urls == [f"{converter.base_url}/files/KEY?depth=1"]
+
+    # New version: it replaces the old entry, other files' entries are left alone
+    (tmp_path / "OTHER-2024-01-01T00-00-00Z.json").write_text("{}")
+    converter.session.file_data = dict(file_data, lastModified="2024-02-03T04:05:06Z")
+    assert converter.get_file_data("KEY") == converter.session.file_data
+    assert sorted(os.listdir(tmp_path)) == ["KEY-2024-02-03T04-05-06Z.json", "OTHER-2024-01-01T00-00-00Z.json"]
+
+
+def test_file_cache_skips_partial_depth(tmp_path):
+    """Test that depth-limited fetches are never written to the cache"""
+    file_data = {"lastModified": "2024-01-02T03:04:05Z", "document": {"id": "0:0", "type": "DOCUMENT"}}
+    converter = _caching_converter(tmp_path, file_data)
+
+    assert converter.get_file_data("KEY", depth=2) == file_data
+    assert converter.session.urls[-1] == f"{converter.base_url}/files/KEY?depth=2"
+    assert os.listdir(tmp_path) == []
+
+
+def test_file_cache_failed_write(tmp_path, monkeypatch):
+    """Test that a failed cache write leaves no temp file behind"""
+    import figma_to_html
+
+    file_data = {"lastModified": "2024-01-02T03:04:05Z", "document": {"id": "0:0", "type": "DOCUMENT"}}
+    converter = _caching_converter(tmp_path, file_data)
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(figma_to_html.os, "replace", failing_replace)
+
+    assert converter.get_file_data("KEY") == file_data
+    assert os.listdir(tmp_path) == []
+
+
+def test_file_cache_disabled(tmp_path):
+    """Test that use_cache=False goes straight to the API and never writes"""
+    file_data = {"lastModified": "2024-01-02T03:04:05Z", "document": {"id": "0:0", "type": "DOCUMENT"}}
+    converter = _caching_converter(tmp_path, file_data)
+    converter.use_cache = False
+
+    converter.get_file_data("KEY")
+    assert converter.session.urls == [f"{converter.base_url}/files/KEY"]
+    assert os.listdir(tmp_path) == []
 
 
 if __name__ == "__main__":
-    sys.exit(run_all_tests())
+    sys.exit(pytest.main([__file__]))